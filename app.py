@@ -1,132 +1,174 @@
+import io
 import streamlit as st
 import pandas as pd
+import numpy as np
+import polars as pl
+import pyarrow as pa
+import pyarrow.csv as pacsv
 import plotly.express as px
 from datetime import datetime
 
+REQUIRED_COLUMNS = [
+    'count', 'protected_brand_id', 'protected_brand_name', 'marketplace_id',
+    'action_type', 'rule_id', 'template_source', 'infringing_brand',
+    'action_date', 'gl_product_group_desc', 'template_sub_type', 'Week'
+]
+
+# Columns referenced by the report; the rest are only checked for presence
+USED_COLUMNS = [
+    'count', 'protected_brand_name', 'marketplace_id', 'Week',
+    'gl_product_group_desc', 'infringing_brand', 'action_date'
+]
+
+CATEGORICAL_COLUMNS = (
+    'protected_brand_name', 'marketplace_id', 'gl_product_group_desc', 'infringing_brand'
+)
+
+def _read_excel_fast(file_bytes):
+    """Read only the required columns of the first sheet using the calamine engine"""
+    return pd.read_excel(
+        io.BytesIO(file_bytes),
+        engine='calamine',
+        usecols=lambda col: col in REQUIRED_COLUMNS
+    )
+
 def load_and_process_data(df):
     """Process the raw data into required format"""
-    required_columns = [
-        'count', 'protected_brand_id', 'protected_brand_name', 'marketplace_id',
-        'action_type', 'rule_id', 'template_source', 'infringing_brand',
-        'action_date', 'gl_product_group_desc', 'template_sub_type', 'Week'
-    ]
-    
-    for col in required_columns:
+    for col in REQUIRED_COLUMNS:
         if col not in df.columns:
             st.error(f"Missing required column: {col}")
             return None, None
-            
-    df['Week'] = pd.to_numeric(df['Week'])
+    
+    # Drop columns the report never reads before any further processing
+    df = df.drop(columns=[col for col in df.columns if col not in USED_COLUMNS])
+    
+    # Rows without a week can't be placed in the trend; searchsorted below also needs them gone
+    df.dropna(subset=['Week'], inplace=True)
+    df['Week'] = pd.to_numeric(df['Week'], downcast='unsigned')
+    df['count'] = pd.to_numeric(df['count'], downcast='unsigned')
+    
+    # Sort by week once so any trailing range of weeks is a contiguous slice
+    df = df.sort_values('Week', kind='mergesort', ignore_index=True)
     unique_weeks = sorted(df['Week'].unique(), reverse=True)[:4]  # Last 4 weeks only
+    
+    # Low-cardinality string columns are grouped on integer codes as categoricals
+    for col in CATEGORICAL_COLUMNS:
+        df[col] = df[col].astype('category')
     return df, unique_weeks
 
-def create_summary_tables(df, unique_weeks):
-    """Create summary tables with grand totals"""
+def _weekly_pivot(scoped_df, key, weeks):
+    """Sum counts per key and week, with one column per week in the given order"""
+    # Aggregate and pivot the integer category codes in Polars, then map them back to labels
+    keys = scoped_df[key].cat
+    pivot = (
+        pl.DataFrame({
+            'code': keys.codes.to_numpy(),
+            'Week': scoped_df['Week'].to_numpy(),
+            'count': scoped_df['count'].to_numpy()
+        })
+        .lazy()
+        .filter(pl.col('code') >= 0)  # -1 marks a missing key
+        .group_by(['code', 'Week'])
+        .agg(pl.col('count').sum())
+        .collect()
+        .pivot(on='Week', index='code', values='count')
+        .fill_null(0)
+        .sort('code')  # Polars groups come back unordered; ties rank by key as before
+        .to_pandas()
+        .set_index('code')
+    )
+    pivot = pivot.reindex(columns=[str(week) for week in weeks], fill_value=0)
+    pivot.columns.name = 'Week'
+    # Plain index so it can take the Grand Total label alongside the keys
+    pivot.index = pd.Index(keys.categories.take(pivot.index.to_numpy()), dtype=object, name=key)
+    return pivot
+
+def _with_totals(pivot):
+    """Add a Grand Total column, sort by it, and append a Grand Total row in one concat"""
+    pivot = pivot.assign(**{'Grand Total': pivot.sum(axis=1)}).sort_values('Grand Total', ascending=False, kind='stable')
+    total = pivot.sum().to_frame().T
+    total.index = pd.Index(['Grand Total'], name=pivot.index.name)
+    return pd.concat([pivot, total], copy=False)
+
+def create_summary_tables(scoped_df, unique_weeks, brand_pivot):
+    """Create summary tables with grand totals from the week-scoped data"""
     # Weekly summary
-    weekly_data = []
-    for week in unique_weeks:
-        count = df[df['Week'] == week]['count'].sum()
-        weekly_data.append({'Week': str(week), 'ASIN Count': count})
-    
-    weekly_df = pd.DataFrame(weekly_data)
-    weekly_df.set_index('Week', inplace=True)
+    week_sum = scoped_df.groupby('Week', observed=True, sort=False)['count'].sum()
+    weekly_df = week_sum.reindex(unique_weeks).rename('ASIN Count').to_frame()
+    weekly_df.index = weekly_df.index.astype(str)
     
     # Add Grand Total
     total = weekly_df['ASIN Count'].sum()
     weekly_df.loc['Grand Total'] = total
     
-    # Top 5 brands
-    brand_totals = df[df['Week'].isin(unique_weeks)].groupby('protected_brand_name')['count'].sum()
-    top_5_brands = brand_totals.nlargest(5).index
-    
-    brand_weekly = pd.pivot_table(
-        df[df['protected_brand_name'].isin(top_5_brands)],
-        values='count',
-        index='protected_brand_name',
-        columns='Week',
-        aggfunc='sum',
-        fill_value=0
+    # Top 5 brands, taken from the full brand pivot (already sorted by Grand Total)
+    brand_weekly = _with_totals(
+        brand_pivot.drop(index='Grand Total', columns='Grand Total').head(5)
     )
     
-    # Ensure correct week columns and order
-    brand_weekly = brand_weekly[unique_weeks]
-    brand_weekly.columns = brand_weekly.columns.astype(str)
-    
-    # Add Grand Total column
-    brand_weekly['Grand Total'] = brand_weekly.sum(axis=1)
-    brand_weekly = brand_weekly.sort_values('Grand Total', ascending=False)
-    
-    # Add Grand Total row
-    brand_weekly.loc['Grand Total'] = brand_weekly.sum()
-    
     return weekly_df, brand_weekly
 
-def create_full_pivot_tables(df, unique_weeks):
-    """Create complete brand and marketplace pivot tables"""
+def create_full_pivot_tables(scoped_df, unique_weeks):
+    """Create complete brand and marketplace pivot tables from the week-scoped data"""
     # Brand-wise pivot
-    brand_pivot = pd.pivot_table(
-        df[df['Week'].isin(unique_weeks)],
-        values='count',
-        index='protected_brand_name',
-        columns='Week',
-        aggfunc='sum',
-        fill_value=0
-    )
-    
-    # Ensure correct week columns and order
-    brand_pivot = brand_pivot[unique_weeks]
-    brand_pivot.columns = brand_pivot.columns.astype(str)
-    
-    # Add Grand Total column and sort
-    brand_pivot['Grand Total'] = brand_pivot.sum(axis=1)
-    brand_pivot = brand_pivot.sort_values('Grand Total', ascending=False)
-    
-    # Add Grand Total row
-    brand_pivot.loc['Grand Total'] = brand_pivot.sum()
+    brand_pivot = _with_totals(_weekly_pivot(scoped_df, 'protected_brand_name', unique_weeks))
     
     # Marketplace-wise pivot
-    marketplace_pivot = pd.pivot_table(
-        df[df['Week'].isin(unique_weeks)],
-        values='count',
-        index='marketplace_id',
-        columns='Week',
-        aggfunc='sum',
-        fill_value=0
-    )
-    
-    # Ensure correct week columns and order
-    marketplace_pivot = marketplace_pivot[unique_weeks]
-    marketplace_pivot.columns = marketplace_pivot.columns.astype(str)
-    
-    # Add Grand Total column and sort
-    marketplace_pivot['Grand Total'] = marketplace_pivot.sum(axis=1)
-    marketplace_pivot = marketplace_pivot.sort_values('Grand Total', ascending=False)
-    
-    # Add Grand Total row
-    marketplace_pivot.loc['Grand Total'] = marketplace_pivot.sum()
+    marketplace_pivot = _with_totals(_weekly_pivot(scoped_df, 'marketplace_id', unique_weeks))
     
     return brand_pivot, marketplace_pivot
 
-def generate_brand_overview(df, latest_week, top_5_brands):
-    """Generate brand overview for top 5 brands"""
+def _counts_by_brand(latest_week_data, col, brand_codes, weights, n_brands):
+    """Brand x category count matrix for a categorical column, built with one bincount
+
+    Requires the categorical dtypes set by load_and_process_data; plain object
+    columns have no .cat accessor.
+    """
+    codes = latest_week_data[col].cat.codes.to_numpy().astype(np.int64)
+    categories = latest_week_data[col].cat.categories
+    valid = (brand_codes >= 0) & (codes >= 0)
+    flat = brand_codes[valid] * len(categories) + codes[valid]
+    counts = np.bincount(flat, weights=weights[valid], minlength=n_brands * len(categories))
+    return counts.reshape(n_brands, len(categories)), categories
+
+def _top_n(row, categories, n):
+    """Largest non-zero entries of a count row as a Series"""
+    if not row.any():
+        return pd.Series(dtype='float64')
+    order = np.argsort(-row, kind='stable')[:n]
+    order = order[row[order] > 0]
+    return pd.Series(row[order], index=categories[order])
+
+def generate_brand_overview(scoped_df, latest_week, top_5_brands):
+    """Generate brand overview for top 5 brands (expects categorical key columns)"""
     brand_overviews = {}
+    brands = list(top_5_brands[:-1])  # Exclude Grand Total
     
-    for brand in top_5_brands[:-1]:  # Exclude Grand Total
-        brand_data = df[df['protected_brand_name'] == brand]
-        latest_week_data = brand_data[brand_data['Week'] == latest_week]
-        
-        total_count = latest_week_data['count'].sum()
+    # Code each latest-week row by its position among the top brands (-1 for others)
+    latest_week_data = scoped_df.loc[scoped_df['Week'] == latest_week]
+    brand_codes = pd.Categorical(
+        latest_week_data['protected_brand_name'], categories=brands
+    ).codes.astype(np.int64)
+    weights = latest_week_data['count'].to_numpy(dtype='float64')
+    
+    in_top = brand_codes >= 0
+    brand_totals = np.bincount(brand_codes[in_top], weights=weights[in_top], minlength=len(brands))
+    marketplace_counts, marketplaces = _counts_by_brand(latest_week_data, 'marketplace_id', brand_codes, weights, len(brands))
+    category_counts, categories = _counts_by_brand(latest_week_data, 'gl_product_group_desc', brand_codes, weights, len(brands))
+    suspect_counts, suspects = _counts_by_brand(latest_week_data, 'infringing_brand', brand_codes, weights, len(brands))
+    
+    for i, brand in enumerate(brands):
+        total_count = brand_totals[i]
         
         # Get marketplace information
-        marketplace_share = (latest_week_data.groupby('marketplace_id')['count'].sum() / total_count * 100)
-        top_marketplace = marketplace_share.nlargest(1)
+        marketplace_share = marketplace_counts[i] / total_count * 100 if total_count else marketplace_counts[i]
+        top_marketplace = _top_n(marketplace_share, marketplaces, 1)
         
         # Get category information
-        category_counts = latest_week_data.groupby('gl_product_group_desc')['count'].sum()
-        top_category = category_counts.nlargest(1)
+        top_category = _top_n(category_counts[i], categories, 1)
         
         # Get suspect brands
-        suspect_brands = latest_week_data.groupby('infringing_brand')['count'].sum().nlargest(2)
+        suspect_brands = _top_n(suspect_counts[i], suspects, 2)
         
         brand_overviews[brand] = {
             'total_suppressions': total_count,
@@ -137,46 +179,138 @@ def generate_brand_overview(df, latest_week, top_5_brands):
     
     return brand_overviews
 
-def create_visualizations(weekly_df, brand_weekly, marketplace_pivot):
-    """Create all visualizations"""
-    # Remove Grand Total for visualizations
-    weekly_data = weekly_df.drop('Grand Total')
-    brand_data = brand_weekly.drop('Grand Total')
-    marketplace_data = marketplace_pivot.drop('Grand Total')
+def create_report(df):
+    """Build every report table from the raw upload, or None if columns are missing"""
+    processed_df, unique_weeks = load_and_process_data(df)
+    if processed_df is None:
+        return None
     
-    # Weekly trend chart
-    fig1 = px.line(
-        weekly_data,
+    latest_week = max(unique_weeks)
+    
+    # Data is sorted by week, so the last 4 weeks are the tail of the frame
+    min_week = unique_weeks[-1]
+    lo = processed_df['Week'].searchsorted(min_week, side='left')
+    scoped_df = processed_df.iloc[lo:]
+    
+    # Create main tables
+    brand_pivot, marketplace_pivot = create_full_pivot_tables(scoped_df, unique_weeks)
+    weekly_df, brand_weekly = create_summary_tables(scoped_df, unique_weeks, brand_pivot)
+    
+    # Generate brand overviews
+    brand_overviews = generate_brand_overview(scoped_df, latest_week, tuple(brand_weekly.index))
+    
+    return latest_week, weekly_df, brand_weekly, brand_pivot, marketplace_pivot, brand_overviews
+
+@st.cache_data(show_spinner=False)
+def load_report(file_bytes):
+    """Read an upload and build the report, cached on the file contents"""
+    # Only the finished tables are cached; DataFrame arguments would be hashed on a sample
+    return create_report(_read_excel_fast(file_bytes))
+
+@st.cache_resource(show_spinner=False)
+def _fig_weekly(weekly_df):
+    """Weekly trend chart"""
+    return px.line(
+        weekly_df.drop('Grand Total'),
         y='ASIN Count',
         title='Weekly Suppression Trend (T4W)',
         markers=True
     )
-    
-    # Top brands chart
-    fig2 = px.bar(
+
+@st.cache_resource(show_spinner=False)
+def _fig_top_brands(brand_weekly):
+    """Top brands chart"""
+    brand_data = brand_weekly.drop('Grand Total')
+    return px.bar(
         brand_data.sort_values('Grand Total'),
         y=brand_data.index,
         x='Grand Total',
         title='Top 5 Brands by Total Suppression',
         orientation='h'
     )
-    
-    # Marketplace distribution
-    fig3 = px.pie(
+
+@st.cache_resource(show_spinner=False)
+def _fig_marketplace(marketplace_pivot):
+    """Marketplace distribution chart"""
+    marketplace_data = marketplace_pivot.drop('Grand Total')
+    return px.pie(
         values=marketplace_data['Grand Total'],
         names=marketplace_data.index,
         title='Suppression Distribution by Marketplace'
     )
-    
-    # Weekly brand trend
-    trend_data = brand_data.drop(columns=['Grand Total']).T
-    fig4 = px.line(
+
+@st.cache_resource(show_spinner=False)
+def _fig_brand_trend(brand_weekly):
+    """Weekly brand trend chart"""
+    trend_data = brand_weekly.drop('Grand Total').drop(columns=['Grand Total']).T
+    return px.line(
         trend_data,
         title='Weekly Brand-wise Trend',
         markers=True
     )
+
+def _count_columns(df):
+    """Integer formatting for every column, applied by the frontend instead of a Styler"""
+    return {col: st.column_config.NumberColumn(format='%d') for col in df.columns}
+
+@st.cache_data(show_spinner=False)
+def _to_csv_bytes(df):
+    """Serialize a report table to CSV bytes with pyarrow"""
+    # Index labels mix keys and 'Grand Total', so write them as strings
+    table = pa.Table.from_pandas(df.set_axis(df.index.astype(str)).reset_index(), preserve_index=False)
+    buf = io.BytesIO()
+    pacsv.write_csv(table, buf)
+    return buf.getvalue()
+
+def render_visualizations(weekly_df, brand_weekly, brand_pivot, marketplace_pivot):
+    """Render the Visualizations tab"""
+    st.header("Analysis Visualizations")
+    
+    # Display visualizations in an organized layout
+    col1, col2 = st.columns(2)
     
-    return fig1, fig2, fig3, fig4
+    with col1:
+        st.plotly_chart(_fig_weekly(weekly_df), use_container_width=True)
+        st.plotly_chart(_fig_marketplace(marketplace_pivot), use_container_width=True)
+    
+    with col2:
+        st.plotly_chart(_fig_top_brands(brand_weekly), use_container_width=True)
+        st.plotly_chart(_fig_brand_trend(brand_weekly), use_container_width=True)
+    
+    # Add download buttons for the data
+    st.markdown("### Download Data")
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        csv_brand = _to_csv_bytes(brand_pivot)
+        st.download_button(
+            "Download Brand-wise Data",
+            csv_brand,
+            "brand_wise_data.csv",
+            "text/csv",
+            key='brand-csv'
+        )
+    
+    with col2:
+        csv_marketplace = _to_csv_bytes(marketplace_pivot)
+        st.download_button(
+            "Download Marketplace Data",
+            csv_marketplace,
+            "marketplace_data.csv",
+            "text/csv",
+            key='marketplace-csv'
+        )
+    
+    with col3:
+        csv_weekly = _to_csv_bytes(weekly_df)
+        st.download_button(
+            "Download Weekly Data",
+            csv_weekly,
+            "weekly_data.csv",
+            "text/csv",
+            key='weekly-csv'
+        )
+
 def main():
     st.title("ASIN Suppression Analysis Dashboard")
     
@@ -184,19 +318,11 @@ def main():
     
     if uploaded_file is not None:
         try:
-            # Load and process data
-            df = pd.read_excel(uploaded_file)
-            processed_df, unique_weeks = load_and_process_data(df)
+            # Load data and build the report tables
+            report = load_report(uploaded_file.getvalue())
             
-            if processed_df is not None:
-                latest_week = max(unique_weeks)
-                
-                # Create main tables
-                weekly_df, brand_weekly = create_summary_tables(processed_df, unique_weeks)
-                brand_pivot, marketplace_pivot = create_full_pivot_tables(processed_df, unique_weeks)
-                
-                # Generate brand overviews
-                brand_overviews = generate_brand_overview(processed_df, latest_week, brand_weekly.index)
+            if report is not None:
+                latest_week, weekly_df, brand_weekly, brand_pivot, marketplace_pivot, brand_overviews = report
                 
                 # Create tabs
                 tab1, tab2 = st.tabs(["Main Report", "Visualizations"])
@@ -216,11 +342,11 @@ def main():
                     
                     # Section 2
                     st.markdown("### Section - 2 : WoW Overall Suppression Trend (T4W)")
-                    st.dataframe(weekly_df.style.format({'ASIN Count': '{:,.0f}'}))
+                    st.dataframe(weekly_df, column_config=_count_columns(weekly_df))
                     
                     # Section 3
                     st.markdown("### Section - 3 : Top 5 Suppression Contributing brands (T4W)")
-                    st.dataframe(brand_weekly.style.format('{:,.0f}'))
+                    st.dataframe(brand_weekly, column_config=_count_columns(brand_weekly))
                     
                     # Section 4
                     st.markdown("### Section - 4 : Brand Overview")
@@ -254,65 +380,14 @@ def main():
                     
                     # 5.1 Brand-wise Suppression
                     st.markdown("#### 5.1 – WoW Brand Wise Suppression Counts (T4W)")
-                    st.dataframe(brand_pivot.style.format('{:,.0f}'))
+                    st.dataframe(brand_pivot, column_config=_count_columns(brand_pivot))
                     
                     # 5.2 Marketplace-wise Suppression
                     st.markdown("#### 5.2 - Marketplace Wise Suppression Counts")
-                    st.dataframe(marketplace_pivot.style.format('{:,.0f}'))
+                    st.dataframe(marketplace_pivot, column_config=_count_columns(marketplace_pivot))
                 
                 with tab2:
-                    st.header("Analysis Visualizations")
-                    
-                    # Create all visualizations
-                    fig1, fig2, fig3, fig4 = create_visualizations(weekly_df, brand_weekly, marketplace_pivot)
-                    
-                    # Display visualizations in an organized layout
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        st.plotly_chart(fig1, use_container_width=True)
-                        st.plotly_chart(fig3, use_container_width=True)
-                    
-                    with col2:
-                        st.plotly_chart(fig2, use_container_width=True)
-                        st.plotly_chart(fig4, use_container_width=True)
-                    
-                    # Add download buttons for the data
-                    st.markdown("### Download Data")
-                    col1, col2, col3 = st.columns(3)
-                    
-                    def convert_df_to_csv(df):
-                        return df.to_csv().encode('utf-8')
-                    
-                    with col1:
-                        csv_brand = convert_df_to_csv(brand_pivot)
-                        st.download_button(
-                            "Download Brand-wise Data",
-                            csv_brand,
-                            "brand_wise_data.csv",
-                            "text/csv",
-                            key='brand-csv'
-                        )
-                    
-                    with col2:
-                        csv_marketplace = convert_df_to_csv(marketplace_pivot)
-                        st.download_button(
-                            "Download Marketplace Data",
-                            csv_marketplace,
-                            "marketplace_data.csv",
-                            "text/csv",
-                            key='marketplace-csv'
-                        )
-                    
-                    with col3:
-                        csv_weekly = convert_df_to_csv(weekly_df)
-                        st.download_button(
-                            "Download Weekly Data",
-                            csv_weekly,
-                            "weekly_data.csv",
-                            "text/csv",
-                            key='weekly-csv'
-                        )
+                    render_visualizations(weekly_df, brand_weekly, brand_pivot, marketplace_pivot)
 
         except Exception as e:
             st.error(f"Error processing file: {str(e)}")
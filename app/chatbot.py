@@ -5,20 +5,52 @@ import re
 class AnalysisChatbot:
     def __init__(self, df: pd.DataFrame):
         self.df = df
-        self.commands = {
-            'top brands': self._get_top_brands,
-            'marketplace stats': self._get_marketplace_stats,
-            'weekly trend': self._get_weekly_trend,
-            'brand details': self._get_brand_details,
+        self._dispatch_re = re.compile(
+            r'(?P<top_brands>top\s+\d*\s*brands?)'
+            r'|(?P<marketplace_stats>marketplace\s+stats)'
+            r'|(?P<weekly_trend>weekly\s+trend)'
+            r'|(?P<brand_details>brand\s+details)'
+            r'|(?P<help>help)',
+            re.I
+        )
+        self._handlers = {
+            'top_brands': self._get_top_brands,
+            'marketplace_stats': self._get_marketplace_stats,
+            'weekly_trend': self._get_weekly_trend,
+            'brand_details': self._get_brand_details,
             'help': self._get_help
         }
+        # Aggregates are computed once and served by every query
+        self._brand_sum = self.df.groupby(
+            'protected_brand_name', observed=True
+        )['count'].sum().sort_values(ascending=False)
+        self._mkt_sum = self.df.groupby(
+            'marketplace_id', observed=True
+        )['count'].sum().sort_values(ascending=False)
+        self._week_sum = self.df.groupby('Week', observed=True)['count'].sum().sort_index()
+        self._brands_lower = {
+            str(brand).lower(): brand
+            for brand in self.df['protected_brand_name'].dropna().unique()
+        }
+        self._brand_regex = None
+        if self._brands_lower:
+            # Longest names first so "brand one" wins over "brand"
+            alternation = '|'.join(
+                re.escape(name) for name in sorted(self._brands_lower, key=len, reverse=True)
+            )
+            self._brand_regex = re.compile(rf'(?<!\w)({alternation})(?!\w)')
+        self._brand_week_sum = self.df.groupby(
+            ['protected_brand_name', 'Week'], observed=True
+        )['count'].sum()
 
     def process_query(self, query: str) -> str:
         """Process user query and return appropriate response."""
         query = query.lower()
         
-        for command, handler in self.commands.items():
-            if command in query:
+        # Several commands can appear in one query; the first in handler order wins
+        found = {match.lastgroup for match in self._dispatch_re.finditer(query)}
+        for command, handler in self._handlers.items():
+            if command in found:
                 return handler(query)
         
         return self._get_help()
@@ -29,30 +61,27 @@ class AnalysisChatbot:
         if match := re.search(r'top (\d+)', query):
             n = int(match.group(1))
         
-        top_brands = self.df.groupby('protected_brand_name')['count'].sum().nlargest(n)
+        top_brands = self._brand_sum.head(n)
         return f"Top {n} brands by suppression count:\n{top_brands.to_string()}"
 
     def _get_marketplace_stats(self, query: str) -> str:
         """Get marketplace statistics."""
-        stats = self.df.groupby('marketplace_id')['count'].sum().sort_values(ascending=False)
-        return f"Marketplace statistics:\n{stats.to_string()}"
+        return f"Marketplace statistics:\n{self._mkt_sum.to_string()}"
 
     def _get_weekly_trend(self, query: str) -> str:
         """Get weekly trend information."""
-        trend = self.df.groupby('Week')['count'].sum()
-        return f"Weekly trend:\n{trend.to_string()}"
+        return f"Weekly trend:\n{self._week_sum.to_string()}"
 
     def _get_brand_details(self, query: str) -> str:
         """Get details for a specific brand."""
-        brands = self.df['protected_brand_name'].unique()
-        for brand in brands:
-            if brand.lower() in query:
-                brand_data = self.df[self.df['protected_brand_name'] == brand]
-                summary = brand_data.groupby('Week')['count'].sum()
-                return f"Details for {brand}:\n{summary.to_string()}"
-        return "Brand not found. Please specify a valid brand name."
+        match = self._brand_regex.search(query) if self._brand_regex else None
+        if not match:
+            return "Brand not found. Please specify a valid brand name."
+        brand = self._brands_lower[match.group(1)]
+        summary = self._brand_week_sum.loc[brand]
+        return f"Details for {brand}:\n{summary.to_string()}"
 
-    def _get_help(self) -> str:
+    def _get_help(self, query: str = '') -> str:
         """Get help message with available commands."""
         return """
         Available commands:
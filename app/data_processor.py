@@ -6,6 +6,15 @@ from typing import Tuple, Dict, Any
 
 logger = logging.getLogger(__name__)
 
+USED_COLUMNS = [
+    'count', 'protected_brand_name', 'marketplace_id', 'Week',
+    'gl_product_group_desc', 'infringing_brand', 'action_date'
+]
+
+CATEGORICAL_COLUMNS = (
+    'protected_brand_name', 'marketplace_id', 'gl_product_group_desc', 'infringing_brand'
+)
+
 class DataProcessor:
     def __init__(self):
         self.df = None
@@ -15,14 +24,26 @@ class DataProcessor:
     def load_data(self, file_path: str) -> None:
         """Load and preprocess the data."""
         try:
-            self.df = pd.read_excel(file_path)
-            self.df['action_date'] = pd.to_datetime(self.df['action_date'])
+            self.df = pd.read_excel(file_path, engine='calamine', usecols=USED_COLUMNS)
+            self.df['action_date'] = pd.to_datetime(
+                self.df['action_date'], format='ISO8601', cache=True, errors='coerce'
+            )
+            self._optimize_dtypes()
             self._create_pivot_tables()
             logger.info("Data loaded successfully")
         except Exception as e:
             logger.error(f"Error loading data: {str(e)}")
             raise
 
+    def _optimize_dtypes(self) -> None:
+        """Downcast numeric columns and store string keys as categoricals."""
+        for col in ('count', 'Week'):
+            if col in self.df.columns:
+                self.df[col] = pd.to_numeric(self.df[col], downcast='unsigned')
+        for col in CATEGORICAL_COLUMNS:
+            if col in self.df.columns:
+                self.df[col] = self.df[col].astype('category')
+
     def _create_pivot_tables(self) -> None:
         """Create pivot tables for analysis."""
         try:
@@ -32,7 +53,8 @@ class DataProcessor:
                 index='protected_brand_name',
                 columns='Week',
                 aggfunc='sum',
-                fill_value=0
+                fill_value=0,
+                observed=True
             )
 
             self.marketplace_pivot = pd.pivot_table(
@@ -41,7 +63,8 @@ class DataProcessor:
                 index='marketplace_id',
                 columns='Week',
                 aggfunc='sum',
-                fill_value=0
+                fill_value=0,
+                observed=True
             )
         except Exception as e:
             logger.error(f"Error creating pivot tables: {str(e)}")
@@ -58,13 +81,16 @@ class DataProcessor:
 
     def filter_data(self, weeks=None, brands=None, marketplaces=None) -> pd.DataFrame:
         """Filter data based on selected criteria."""
-        filtered_df = self.df.copy()
+        if not (weeks or brands or marketplaces):
+            return self.df
+        
+        mask = np.ones(len(self.df), dtype=bool)
         
         if weeks:
-            filtered_df = filtered_df[filtered_df['Week'].isin(weeks)]
+            mask &= self.df['Week'].isin(weeks).to_numpy()
         if brands:
-            filtered_df = filtered_df[filtered_df['protected_brand_name'].isin(brands)]
+            mask &= self.df['protected_brand_name'].isin(brands).to_numpy()
         if marketplaces:
-            filtered_df = filtered_df[filtered_df['marketplace_id'].isin(marketplaces)]
+            mask &= self.df['marketplace_id'].isin(marketplaces).to_numpy()
             
-        return filtered_df
+        return self.df.loc[mask]
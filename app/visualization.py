@@ -7,7 +7,7 @@ class Visualizer:
     @staticmethod
     def create_trend_chart(df: pd.DataFrame) -> go.Figure:
         """Create weekly trend chart."""
-        weekly_trend = df.groupby('Week')['count'].sum()
+        weekly_trend = df.groupby('Week', observed=True)['count'].sum()
         fig = px.line(
             weekly_trend,
             title='Weekly Suppression Trend',
@@ -18,7 +18,7 @@ class Visualizer:
     @staticmethod
     def create_brand_chart(df: pd.DataFrame, top_n: int = 10) -> go.Figure:
         """Create top brands chart."""
-        top_brands = df.groupby('protected_brand_name')['count'].sum().nlargest(top_n)
+        top_brands = df.groupby('protected_brand_name', observed=True)['count'].sum().nlargest(top_n)
         fig = px.bar(
             top_brands,
             title=f'Top {top_n} Brands by Suppression Count',
@@ -29,7 +29,7 @@ class Visualizer:
     @staticmethod
     def create_marketplace_chart(df: pd.DataFrame) -> go.Figure:
         """Create marketplace distribution chart."""
-        marketplace_data = df.groupby('marketplace_id')['count'].sum()
+        marketplace_data = df.groupby('marketplace_id', observed=True)['count'].sum()
         fig = px.pie(
             values=marketplace_data.values,
             names=marketplace_data.index,
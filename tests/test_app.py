@@ -1,3 +1,6 @@
+import importlib.util
+from pathlib import Path
+
 import pytest
 import pandas as pd
 from app.data_processor import DataProcessor
@@ -14,6 +17,105 @@ def sample_data():
         'action_date': ['2024-01-01', '2024-01-02', '2024-01-03']
     })
 
+@pytest.fixture
+def report_app():
+    # Root app.py shares its name with the app/ package, so load it by path
+    spec = importlib.util.spec_from_file_location(
+        'report_app', Path(__file__).resolve().parent.parent / 'app.py'
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+@pytest.fixture
+def report_data():
+    rows = 12
+    return pd.DataFrame({
+        'count': [5, 3, 2, 7, 1, 4, 6, 2, 3, 8, 1, 2],
+        'protected_brand_id': list(range(rows)),
+        'protected_brand_name': ['A', 'B', 'C', 'D', 'E', 'F'] * 2,
+        'marketplace_id': [1, 3, 4, 44551] * 3,
+        'action_type': ['suppress'] * rows,
+        'rule_id': [10] * rows,
+        'template_source': ['src'] * rows,
+        'infringing_brand': ['X', 'Y', 'Z'] * 4,
+        'action_date': ['2024-01-01'] * rows,
+        'gl_product_group_desc': ['Toys', 'Home'] * 6,
+        'template_sub_type': ['sub'] * rows,
+        'Week': [1, 2, 3, 4, 5, 6] * 2
+    })
+
+def test_report_pipeline(report_app, report_data):
+    latest_week, weekly_df, brand_weekly, brand_pivot, marketplace_pivot, brand_overviews = (
+        report_app.create_report(report_data)
+    )
+    assert latest_week == 6
+    assert list(weekly_df.index) == ['6', '5', '4', '3', 'Grand Total']
+    assert weekly_df.loc['Grand Total', 'ASIN Count'] == weekly_df['ASIN Count'].iloc[:-1].sum()
+    assert brand_weekly.index[-1] == 'Grand Total'
+    assert brand_pivot.loc['Grand Total', 'Grand Total'] == weekly_df.loc['Grand Total', 'ASIN Count']
+    assert set(brand_overviews) == set(brand_weekly.index[:-1])
+
+def test_brand_overview_matches_groupby(report_app, report_data):
+    # Brand C is in the top 5 but has no rows in the latest week
+    data = report_data.assign(Week=[6, 6, 5, 6, 5, 6, 6, 6, 3, 6, 4, 6])
+    latest_week, _, brand_weekly, _, _, brand_overviews = report_app.create_report(data)
+    processed_df, _ = report_app.load_and_process_data(data)
+    latest = processed_df[processed_df['Week'] == latest_week]
+    assert list(brand_weekly.index) == ['D', 'A', 'F', 'B', 'C', 'Grand Total']
+    assert brand_overviews['C']['total_suppressions'] == 0
+    
+    for brand, overview in brand_overviews.items():
+        brand_rows = latest[latest['protected_brand_name'] == brand]
+        total = brand_rows['count'].sum()
+        
+        def top(col, n):
+            return brand_rows.groupby(col, observed=True)['count'].sum().nlargest(n)
+        
+        expected = {
+            'top_marketplace': top('marketplace_id', 1) / total * 100 if total else top('marketplace_id', 1),
+            'top_category': top('gl_product_group_desc', 1),
+            'suspect_brands': top('infringing_brand', 2)
+        }
+        assert overview['total_suppressions'] == total
+        for key, series in expected.items():
+            assert list(overview[key].index) == list(series.index)
+            assert list(overview[key]) == pytest.approx(list(series))
+
+def test_blank_weeks_are_dropped(report_app, report_data):
+    blanks = report_data.head(8).assign(Week=None)
+    with_blanks = pd.concat([report_data, blanks], ignore_index=True)
+    processed_df, unique_weeks = report_app.load_and_process_data(with_blanks)
+    assert processed_df['Week'].notna().all()
+    assert list(unique_weeks) == [6, 5, 4, 3]
+    _, weekly_df, *_ = report_app.create_report(with_blanks)
+    assert list(weekly_df.index) == ['6', '5', '4', '3', 'Grand Total']
+    expected = report_data.loc[report_data['Week'] >= 3, 'count'].sum()
+    assert weekly_df.loc['Grand Total', 'ASIN Count'] == expected
+
+def test_marketplace_pivot_integer_ids(report_app, report_data):
+    processed_df, unique_weeks = report_app.load_and_process_data(report_data)
+    scoped_df = processed_df[processed_df['Week'].isin(unique_weeks)]
+    _, marketplace_pivot = report_app.create_full_pivot_tables(scoped_df, unique_weeks)
+    assert set(marketplace_pivot.index) == {1, 3, 4, 44551, 'Grand Total'}
+    assert marketplace_pivot.loc['Grand Total', 'Grand Total'] == scoped_df['count'].sum()
+
+def test_brand_pivot_mixed_type_names(report_app, report_data):
+    # Numeric-looking brand names come out of Excel as ints next to strings
+    mixed = report_data.assign(protected_brand_name=['A', 101, 'C', 202, 'E', 303] * 2)
+    _, weekly_df, _, brand_pivot, _, _ = report_app.create_report(mixed)
+    assert set(brand_pivot.index) == {'C', 202, 'E', 303, 'Grand Total'}
+    assert brand_pivot.loc['Grand Total', 'Grand Total'] == weekly_df.loc['Grand Total', 'ASIN Count']
+
+def test_top_brands_ties_rank_by_name(report_app, report_data):
+    tied = report_data.assign(
+        count=1,
+        protected_brand_name=['F', 'E', 'D', 'C', 'B', 'A'] * 2,
+        Week=[3, 4, 5, 6] * 3
+    )
+    _, _, brand_weekly, *_ = report_app.create_report(tied)
+    assert list(brand_weekly.index) == ['A', 'B', 'C', 'D', 'E', 'Grand Total']
+
 def test_data_processor_load(sample_data):
     processor = DataProcessor()
     processor.df = sample_data
@@ -26,3 +128,22 @@ def test_chatbot_response(sample_data):
     response = chatbot.process_query("top brands")
     assert "Brand1" in response
     assert "Brand2" in response
+
+def test_data_processor_filter(sample_data):
+    processor = DataProcessor()
+    processor.df = sample_data
+    filtered = processor.filter_data(weeks=[1], brands=['Brand1'])
+    assert filtered['count'].tolist() == [1]
+    assert processor.filter_data() is processor.df
+
+def test_chatbot_brand_details(sample_data):
+    chatbot = AnalysisChatbot(sample_data)
+    assert "Details for Brand2" in chatbot.process_query("brand details brand2")
+    assert "Brand not found" in chatbot.process_query("brand details unknown")
+
+def test_chatbot_dispatch(sample_data):
+    chatbot = AnalysisChatbot(sample_data)
+    assert "Top 1 brands" in chatbot.process_query("show top 1 brands")
+    assert "Weekly trend" in chatbot.process_query("Weekly Trend please")
+    assert "Available commands" in chatbot.process_query("help")
+    assert "Weekly trend" in chatbot.process_query("help me read weekly trend")